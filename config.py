@@ -2,20 +2,22 @@
 
 from os import getenv
 
-from devices import *
-from subsystems import *
+from devices import Button, LCDDisplay, Servo, TMCStepper
+from subsystems import Claw, Differential, EndEffector, Gantry, System
+
+UART = getenv('TMC_UART', '/dev/serial0')
 
 
 def get_manual_capture_button() -> Button:
-    return Button(17)
+    # edge-triggered through RPi.GPIO's event detection; the bounce time keeps one press from firing repeatedly
+    return Button(17, bounce_time=0.05)
 
 
 def get_lcd_display() -> LCDDisplay:
     return LCDDisplay(addr=0x27, backlight_enabled=True)
 
 
-def get_system() -> System:    
-    uart = getenv('TMC_UART', '/dev/serial0')
+def get_system() -> System:
     return System(
         claw=Claw(
             grip_servo=Servo(4),
@@ -33,12 +35,12 @@ def get_system() -> System:
         gantry=Gantry(
             left=TMCStepper(
                 control_pin=21, step_pin=16, dir_pin=20, 
-                uart=uart,
+                uart=UART,
                 current=1600,  # in mA
             ),
             right=TMCStepper(
                 control_pin=5, step_pin=6, dir_pin=13,
-                uart=uart,
+                uart=UART,
                 current=1600,
             ),
         ),
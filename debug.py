@@ -1,25 +1,33 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-from devices import TMCStepper
-
 
 class MotorPanel(ttk.LabelFrame):
-    def __init__(self, master, name: str, motor, *, max_speed=4000, poll_ms=100):
+    def __init__(
+        self, master, name: str, motor, *,
+        max_speed=4000, poll_ms_active=20, poll_ms_idle=500, poll_ms_hidden=2000,
+    ):
         super().__init__(master, text=name, padding=(10, 8))
         self.motor = motor
         self.max_speed = max_speed
-        self.poll_ms = poll_ms
+        self.poll_ms_active = poll_ms_active  # while the motor is moving
+        self.poll_ms_idle = poll_ms_idle      # while the motor is at rest
+        self.poll_ms_hidden = poll_ms_hidden  # while the window is not viewable (e.g. minimized)
 
         # State vars
         self.var_enabled = tk.BooleanVar(value=True)
-        self.var_speed   = tk.IntVar(value=min(1000, getattr(self.motor, "target_speed", 1000)))
+        self.var_speed   = tk.IntVar(value=min(1000, self.motor.target_speed))
         self.var_jog     = tk.IntVar(value=200)    # steps per jog
         self.var_goto    = tk.IntVar(value=0)      # absolute steps
         self.var_pos     = tk.IntVar(value=0)      # current position (read-only)
         self.var_target  = tk.IntVar(value=0)      # target (read-only)
         self.var_curspeed= tk.IntVar(value=0)      # current speed (read-only)
 
+        # Last polled values, so unchanged readouts don't trigger Tk redraws
+        self._last_pos = 0
+        self._last_target = 0
+        self._last_speed = 0
+
         # --- Row 0: enable/disable + stop
         row0 = ttk.Frame(self)
         row0.grid(row=0, column=0, sticky="ew", pady=(0,6))
@@ -64,8 +72,9 @@ class MotorPanel(ttk.LabelFrame):
         # Apply initial speed
         self.apply_speed()
 
-        # Start polling loop to update UI
-        self.after(self.poll_ms, self._poll)
+        # Start polling loop to update UI, resuming immediately when the window is restored
+        self._poll_id = self.after(self.poll_ms_active, self._poll)
+        self.winfo_toplevel().bind("<Map>", self._on_map, add="+")
 
     # ---- Commands ----
     def enable(self):
@@ -133,17 +142,45 @@ class MotorPanel(ttk.LabelFrame):
             messagebox.showerror("Set zero failed", str(e))
 
     # ---- Poller ----
+    def _on_map(self, event):
+        # Toplevel bindings also fire for every child widget; only react to the window itself
+        if event.widget is not self.winfo_toplevel():
+            return
+        self.after_cancel(self._poll_id)
+        self._poll()
+
     def _poll(self):
+        if not self.winfo_viewable():
+            # Nobody is looking at the readouts, so don't spend motor reads on them
+            self._poll_id = self.after(self.poll_ms_hidden, self._poll)
+            return
+
+        next_ms = self.poll_ms_idle
         try:
             # Read live state from motor
-            self.var_pos.set(getattr(self.motor, "position", 0))
-            self.var_target.set(getattr(self.motor, "target", 0))
-            self.var_curspeed.set(getattr(self.motor, "speed", 0))
-        except Exception:
-            # Ignore transient read errors
+            m = self.motor
+            pos = m.position
+            target = m.target
+            speed = m.speed
+
+            # Only push changed values through Tk
+            if pos != self._last_pos:
+                self.var_pos.set(pos)
+                self._last_pos = pos
+            if target != self._last_target:
+                self.var_target.set(target)
+                self._last_target = target
+            if speed != self._last_speed:
+                self.var_curspeed.set(speed)
+                self._last_speed = speed
+
+            if speed or pos != target:
+                next_ms = self.poll_ms_active
+        except OSError:
+            # Ignore transient read errors (serial.SerialException is an OSError)
             pass
         finally:
-            self.after(self.poll_ms, self._poll)
+            self._poll_id = self.after(next_ms, self._poll)
 
 
 class App(tk.Tk):
@@ -218,16 +255,18 @@ class App(tk.Tk):
 
 # ---------- WIRE UP YOUR MOTORS HERE ----------
 def main():
-    uart = "/dev/serial0"
+    # imported here so that importing this module doesn't pull in the tmc_driver/GPIO stack
+    from config import UART
+    from devices import TMCStepper
 
     left = TMCStepper(
         control_pin=21, step_pin=16, dir_pin=20,
-        uart=uart,
+        uart=UART,
         current=1600,  # mA
     )
     right = TMCStepper(
         control_pin=5, step_pin=6, dir_pin=13,
-        uart=uart,
+        uart=UART,
         current=1600,  # mA
     )
 
@@ -18,9 +18,13 @@ if TYPE_CHECKING or IS_RPI:
     from .stepper import StepperDirection, Stepper, Nema17Stepper
     from .tmc_stepper import TMCStepper
 else:
-    exec('from .mock_gpio import *')
+    from .mock_gpio import (
+        Button, Device, RPiGPIOFactory, LCDDisplay, Servo,
+        StepperDirection, Stepper, Nema17Stepper, TMCStepper,
+    )
 
-Device.pin_factory = RPiGPIOFactory()
+if IS_RPI:
+    Device.pin_factory = RPiGPIOFactory()
 
 __all__ = (
     'IS_RPI',
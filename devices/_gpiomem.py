@@ -0,0 +1,64 @@
+"""Direct GPIO output through the BCM283x/BCM2711 registers mapped by ``/dev/gpiomem``."""
+
+from __future__ import annotations
+
+import mmap
+import os
+from logging import getLogger
+
+__all__ = ('GPIOMem', 'open_gpiomem')
+
+log = getLogger(__name__)
+
+# word offsets into the GPIO register block
+_GPSET0 = 0x1C // 4
+_GPCLR0 = 0x28 // 4
+
+# SoCs sharing this register layout; the Pi 5's GPIOs sit behind the RP1 and are laid out differently
+_COMPATIBLE = (b'brcm,bcm2835', b'brcm,bcm2836', b'brcm,bcm2837', b'brcm,bcm2711')
+
+
+class GPIOMem:
+    """Writes GPIO 0-31 levels with single register stores, rather than a library call per pin.
+
+    The pins must already be configured as outputs (e.g. by gpiozero).
+    """
+
+    __slots__ = ('_map', '_regs')
+
+    def __init__(self) -> None:
+        fd = os.open('/dev/gpiomem', os.O_RDWR | os.O_SYNC)
+        try:
+            self._map = mmap.mmap(fd, 4096)
+        finally:
+            os.close(fd)
+        self._regs = memoryview(self._map).cast('I')
+
+    def write(self, set_mask: int, clr_mask: int) -> None:
+        """Drives the pins in `set_mask` high and the pins in `clr_mask` low."""
+        regs = self._regs
+        regs[_GPSET0] = set_mask
+        regs[_GPCLR0] = clr_mask
+
+
+_GPIOMEM: GPIOMem | None = None
+
+
+def open_gpiomem() -> GPIOMem | None:
+    """Returns the shared :class:`GPIOMem`, or None if this board doesn't support it."""
+    global _GPIOMEM
+    if _GPIOMEM is None:
+        try:
+            with open('/proc/device-tree/compatible', 'rb') as f:
+                compatible = f.read().split(b'\0')
+        except OSError:
+            return None
+        if not any(c in compatible for c in _COMPATIBLE):
+            return None
+
+        try:
+            _GPIOMEM = GPIOMem()
+        except OSError as exc:
+            log.warning(f"Could not map /dev/gpiomem, falling back to RPi.GPIO: {exc}")
+            return None
+    return _GPIOMEM
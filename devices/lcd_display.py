@@ -1,12 +1,42 @@
 import time
 from logging import getLogger
-from textwrap import wrap
+from threading import Lock
 
 import smbus2 as smbus
+from smbus2 import i2c_msg
 
 log = getLogger(__name__)
 
 
+def _build_lut(rs: int, bl: int) -> bytes:
+    """Builds the 4 expander bytes for every byte value: each nibble with EN high, then EN low."""
+    lut = bytearray()
+    for value in range(256):
+        hi = (value & 0xF0) | rs | bl  # bit7-4 first
+        lo = ((value & 0x0F) << 4) | rs | bl  # bit3-0 second
+        lut += bytes((hi | 0x04, hi, lo | 0x04, lo))  # EN = 1, then EN = 0
+    return bytes(lut)
+
+
+def _wrap2(text: str, width: int) -> list[str]:
+    """Greedily word-wraps `text` into at most two lines of `width` characters.
+
+    Good enough for a 16x2 display and much cheaper than :func:`textwrap.wrap`. Words longer than a line are split.
+    """
+    lines = []
+    text = text.strip()
+    while text and len(lines) < 2:
+        if len(text) <= width:
+            lines.append(text)
+            break
+        cut = text.rfind(' ', 0, width + 1)
+        if cut <= 0:
+            cut = width
+        lines.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    return lines
+
+
 class LCDDisplay:
     """Controls a 16x2 LCD display using I2C protocol.
     
@@ -20,9 +50,12 @@ class LCDDisplay:
     
     def __init__(self, addr: int = 0x27, *, backlight_enabled: bool = True):
         self.addr: int = addr
-        self.backlight_enabled: bool = backlight_enabled
+        self.backlight_enabled = backlight_enabled  # also builds the nibble lookup tables
         self.bus: smbus.SMBus = smbus.SMBus(1)
-        self._is_writing: bool = False
+        # Held for the duration of each transaction, since the display is written from several threads
+        self._bus_lock: Lock = Lock()
+        # What is currently shown on each line, so redraws of unchanged text can be skipped
+        self._frame: list[str] = [' ' * 16, ' ' * 16]
         try:
             self.setup()
         except Exception as exc:
@@ -34,74 +67,72 @@ class LCDDisplay:
                 f"with backlight {'on' if self.backlight_enabled else 'off'}"
             )
 
-    def setup(self) -> None:      
-        self.send_command(0x33)  # Must initialize to 8-line mode at first
-        time.sleep(0.005)
-        self.send_command(0x32)  # Then initialize to 4-line mode
-        time.sleep(0.005)
+    def setup(self) -> None:
+        # Reset by instruction: the controller may be in either 8- or 4-bit mode, so the first nibbles
+        # go out one at a time with the datasheet's waits, which are far longer than a byte on the bus
+        for nibble, delay in ((0x3, 0.0045), (0x3, 0.00015), (0x3, 0.00015), (0x2, 0.00015)):
+            self._send_nibble(nibble)  # 8-line mode three times, then 4-line mode
+            time.sleep(delay)
         self.send_command(0x28)  # 2 lines & 5*7 dots
-        time.sleep(0.005)
         self.send_command(0x0C)  # Enable display without cursor
-        time.sleep(0.005)
         self.send_command(0x01)  # Clear sreen
+        time.sleep(0.002)  # clearing takes 1.52 ms, unlike other instructions
         self.bus.write_byte(self.addr, 0x08)
+
+    def _send_nibble(self, nibble: int) -> None:
+        """Sends a single 4-bit instruction nibble, for the reset sequence before 4-bit mode is set."""
+        data = (nibble << 4) | self._bl_mask
+        with self._bus_lock:
+            self._send(bytes((data | 0x04, data)))  # EN = 1, then EN = 0
         
     def write_word(self, data: int) -> None:
-        if self.backlight_enabled:
-            data |= 0x08
-        else:
-            data &= 0xF7
-        self.bus.write_byte(self.addr, data)
+        with self._bus_lock:
+            self.bus.write_byte(self.addr, (data & 0xF7) | self._bl_mask)
+
+    def set_backlight(self, on: bool) -> None:
+        """Turns the backlight on or off immediately."""
+        self.backlight_enabled = on
+        self.write_word(0x00)  # EN low, so only the backlight bit takes effect
+
+    @property
+    def backlight_enabled(self) -> bool:
+        """Whether the backlight is enabled."""
+        return self._backlight_enabled
+
+    @backlight_enabled.setter
+    def backlight_enabled(self, value: bool) -> None:
+        self._backlight_enabled = value
+        self._bl_mask: int = 0x08 if value else 0x00
+        self._cmd_lut: bytes = _build_lut(0x00, self._bl_mask)  # RS = 0, RW = 0
+        self._data_lut: bytes = _build_lut(0x01, self._bl_mask)  # RS = 1, RW = 0
+
+    def _send(self, buf: bytes) -> None:
+        # At I2C clock rates each byte takes far longer than the HD44780's EN pulse width and
+        # command execution time (once initialized, and except for clear), so the nibbles can
+        # be sent back-to-back in one transaction.
+        self.bus.i2c_rdwr(i2c_msg.write(self.addr, buf))
 
     def send_command(self, cmd: int) -> None:
-        # Send bit7-4 firstly
-        buf = cmd & 0xF0
-        buf |= 0x04  # RS = 0, RW = 0, EN = 1
-        self.write_word(buf)
-        time.sleep(0.002)
-        buf &= 0xFB  # Make EN = 0
-        self.write_word(buf)
-    
-        # Send bit3-0 secondly
-        buf = (cmd & 0x0F) << 4
-        buf |= 0x04  # RS = 0, RW = 0, EN = 1
-        self.write_word(buf)
-        time.sleep(0.002)
-        buf &= 0xFB  # Make EN = 0
-        self.write_word(buf)
+        i = (cmd & 0xFF) * 4
+        with self._bus_lock:
+            self._send(self._cmd_lut[i:i + 4])
 
     def send_data(self, data: int) -> None:
-        # Send bit7-4 firstly
-        buf = data & 0xF0
-        buf |= 0x05  # RS = 1, RW = 0, EN = 1
-        self.write_word(buf)
-        time.sleep(0.002)
-        buf &= 0xFB  # Make EN = 0
-        self.write_word(buf)
-    
-        # Send bit3-0 secondly
-        buf = (data & 0x0F) << 4
-        buf |= 0x05  # RS = 1, RW = 0, EN = 1
-        self.write_word(buf)
-        time.sleep(0.002)
-        buf &= 0xFB  # Make EN = 0
-        self.write_word(buf)
+        i = (data & 0xFF) * 4
+        with self._bus_lock:
+            self._send(self._data_lut[i:i + 4])
 
     def clear(self) -> None:
-        self._wait()
-        self.send_command(0x01)  # Clear Screen
+        with self._bus_lock:
+            self._send(self._cmd_lut[0x01 * 4:0x02 * 4])  # Clear Screen
+            time.sleep(0.002)  # clearing takes 1.52 ms, unlike other instructions
+            self._frame = [' ' * 16, ' ' * 16]
     
     def openlight(self) -> None:  # Enable the backlight
         self.bus.write_byte(0x27, 0x08)
         self.bus.close()
         
-    def _wait(self) -> None:
-        while self._is_writing:
-            time.sleep(0.002)
-
     def _write(self, text: str, x: int, y: int) -> None:
-        self._wait()
-        self._is_writing = True
         if x < 0:
             x = 0
         if x > 15:
@@ -110,14 +141,59 @@ class LCDDisplay:
             y = 0
         if y > 1:
             y = 1
-    
-        # Move cursor
-        addr = 0x80 + 0x40 * y + x
-        self.send_command(addr)
-    
-        for char in text:
-            self.send_data(ord(char))
-        self._is_writing = False
+
+        with self._bus_lock:
+            buf, line = self._update_line(text, x, y)
+            if buf:
+                self._send(buf)
+                self._frame[y] = line  # only once the display actually has it
+
+    def _update_line(self, text: str, x: int, y: int) -> tuple[bytearray, str]:
+        """The wire bytes that bring line `y` to show `text` at column `x`, and the resulting line.
+
+        Only the shortest run of cells that actually differ from what is shown is rewritten,
+        so the bytes are empty if the text is already on screen. :attr:`_frame` is left for the
+        caller to update once the bytes have been sent. Must be called with the bus lock held.
+        """
+        text = text[:16 - x]  # anything further lands in DDRAM that isn't shown
+        line = self._frame[y]
+        old = line[x:x + len(text)]
+        first = 0
+        last = len(text) - 1
+        while first <= last and text[first] == old[first]:
+            first += 1
+        while last >= first and text[last] == old[last]:
+            last -= 1
+        if first > last:
+            return bytearray(), line
+
+        new_line = line[:x] + text + line[x + len(text):]
+        return self._line_bytes(text[first:last + 1], x + first, y), new_line
+
+    def _line_bytes(self, text: str, x: int, y: int) -> bytearray:
+        """The wire bytes that move the cursor to (x, y) and then write `text`.
+
+        Characters outside ASCII are shown as '?', since the display's upper character ROM half isn't Latin-1.
+        """
+        i = (0x80 + 0x40 * y + x) * 4
+        buf = bytearray(self._cmd_lut[i:i + 4])
+        lut = self._data_lut
+        buf += b''.join([lut[c * 4:c * 4 + 4] for c in text.encode('ascii', 'replace')])
+        return buf
+
+    def write_frame(self, top: str, bottom: str) -> None:
+        """Overwrite both lines of the display in a single I2C transaction.
+
+        Each line is padded with spaces (or truncated) to 16 characters, so no clear is needed beforehand.
+        Only the characters that differ from what is already shown are sent.
+        """
+        with self._bus_lock:
+            top_buf, top = self._update_line(top.ljust(16), 0, 0)
+            bottom_buf, bottom = self._update_line(bottom.ljust(16), 0, 1)
+            buf = top_buf + bottom_buf
+            if buf:
+                self._send(buf)
+                self._frame = [top, bottom]  # only once the display actually has them
 
     def write_top(self, text: str, *, offset_left: int = 0) -> None:
         self._write(text, offset_left, 0)
@@ -137,21 +213,14 @@ class LCDDisplay:
         offset_left: int
             The number of characters to offset the text from the left (default is 0).
         """
-        self.clear()
         width = 16 - offset_left
-        lines = wrap(text, width)
-        if len(lines) > 2:
-            lines = lines[:2]
-        elif len(lines) == 1:
-            if bottom_text is None:
-                self.write_top(lines[0], offset_left=offset_left)
-                return
-            else:
-                lines.append(bottom_text)
+        lines = _wrap2(text, width) or ['']
+        if len(lines) == 1:
+            lines.append(bottom_text or '')
 
+        pad = ' ' * offset_left
         top, bottom = lines
-        self.write_top(top, offset_left=offset_left)
-        self.write_bottom(bottom, offset_left=offset_left)
+        self.write_frame(pad + top, pad + bottom)
 
 
 if __name__ == '__main__':
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from threading import Thread
+from threading import Event, Thread
 
 __all__ = (
     'Button', 'Device', 'RPiGPIOFactory', 'LCDDisplay',
@@ -13,14 +13,16 @@ __all__ = (
 
 
 class Button:
-    when_pressed = None
-    when_released = None
-    on_press = None
-    on_release = None
-    
-    def __init__(self, pin: int, pull_up: bool = True) -> None:
+    __slots__ = ('pin', 'pull_up', 'bounce_time', 'when_pressed', 'when_released', 'on_press', 'on_release')
+
+    def __init__(self, pin: int, pull_up: bool = True, *, bounce_time: float | None = None) -> None:
         self.pin = pin
         self.pull_up = pull_up
+        self.bounce_time = bounce_time
+        self.when_pressed = None
+        self.when_released = None
+        self.on_press = None
+        self.on_release = None
 
 
 class Device:
@@ -32,6 +34,8 @@ class RPiGPIOFactory:
 
 
 class LCDDisplay:
+    __slots__ = ('addr', 'backlight_enabled')
+
     def __init__(self, addr: int = 0x27, *, backlight_enabled: bool = True):
         self.addr: int = addr
         self.backlight_enabled: bool = backlight_enabled
@@ -42,20 +46,28 @@ class LCDDisplay:
     def openlight(self) -> None:  # Enable the backlight
         pass
 
+    def set_backlight(self, on: bool) -> None:
+        self.backlight_enabled = on
+
     def write_top(self, text: str, *, offset_left: int = 0) -> None:
         pass
 
     def write_bottom(self, text: str, *, offset_left: int = 0) -> None:
         pass
 
+    def write_frame(self, top: str, bottom: str) -> None:
+        pass
+
     def write(self, text: str, bottom_text: str | None = None, *, offset_left: int = 0) -> None:
         pass
     
     
 class OutputDevice:
+    __slots__ = ('pin', '_value')
+
     def __init__(self, pin: int) -> None:
         self.pin = pin
-        self.value = False  # Simulate the output state
+        self._value = False  # Simulate the output state
 
     @property
     def value(self) -> bool:
@@ -72,6 +84,23 @@ class StepperDirection(Enum):
 
 
 class Stepper:
+    __slots__ = (
+        'pins',
+        'seq',
+        'steps',
+        'target',
+        'steps_per_revolution',
+        'accel_steps',
+        '_delay',
+        '_max_delay',
+        'direction',
+        '_worker',
+        '_worker_keepalive',
+        '_worker_busy',
+        '_idle_event',
+        '_wake_event',
+    )
+
     def __init__(
         self,
         *pins: int,
@@ -91,15 +120,20 @@ class Stepper:
 
         self.steps_per_revolution = steps_per_revolution
         self.accel_steps: int = max(1, accel_steps)
-        self.delay = delay
+        if delay < 0:
+            raise ValueError('Delay must be non-negative')
+        self._delay = delay
         self._max_delay = max_delay
 
         self._worker: Thread | None = None
         self._worker_keepalive: bool = False
         self._worker_busy: bool = False
+        self._idle_event: Event = Event()
+        self._idle_event.set()
+        self._wake_event: Event = Event()
 
     @property
-    def delay(self) -> int:
+    def delay(self) -> float:
         return self._delay
 
     @delay.setter
@@ -118,8 +152,7 @@ class Stepper:
 
     def wait(self) -> None:
         """Waits for the stepper to finish its current operation."""
-        while self.is_busy:
-            pass
+        self._idle_event.wait()
 
     def step(self) -> None:
         self.steps += self.direction.value
@@ -139,13 +172,18 @@ class Stepper:
 
         self.target = None
         self._worker_keepalive = False
+        self._wake_event.set()
         self._worker.join()
         self._worker = None
+        self._worker_busy = False
+        self._idle_event.set()
         self.steps = -1
 
     def loop(self) -> None:
+        # nothing to drive, so just park the thread until stop() wakes it
         while self._worker_keepalive:
-            pass
+            self._wake_event.wait()
+        self._wake_event.clear()
 
     def __enter__(self) -> Stepper:
         return self
@@ -155,10 +193,12 @@ class Stepper:
 
 
 class Nema17Stepper(Stepper):
-    pass
+    __slots__ = ()
 
 
 class Servo:
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs) -> None:
         pass
     
@@ -171,16 +211,61 @@ class Servo:
         if not (0 <= value <= 270):
             raise ValueError('Angle must be between 0 and 270 degrees')
 
+    @classmethod
+    def begin_batch(cls) -> None:
+        pass
 
-class TMCStepper:
-    def __init__(self, *args, **kwargs) -> None:
+    @classmethod
+    def commit_batch(cls) -> None:
         pass
 
+    @classmethod
+    def write_many(cls, angles: dict[Servo, float | None]) -> None:
+        for servo, angle in angles.items():
+            if angle is not None:
+                servo.angle = angle
+
+
+class TMCStepper:
+    __slots__ = ('position', 'max_speed', 'acceleration', 'steps_per_revolution')
+
+    def __init__(self, *args, steps_per_revolution: int = 200, **kwargs) -> None:
+        self.position: int = 0
+        self.max_speed: int = 100
+        self.acceleration: int = 2000
+        self.steps_per_revolution: int = steps_per_revolution
+
+    @property
+    def target_speed(self) -> int:
+        return self.max_speed
+
+    @target_speed.setter
+    def target_speed(self, speed: int) -> None:
+        self.max_speed = speed
+
     def enable(self) -> None:
         pass
 
     def disable(self) -> None:
         pass
 
+    def set_current(self, current: int) -> None:
+        pass
+
+    def deinit(self) -> None:
+        pass
+
     def run_to_position(self, position: int) -> None:
+        self.position = position
+
+    def wait(self) -> None:
         pass
+
+    def stop(self) -> None:
+        pass
+
+    @classmethod
+    def set_targets(cls, targets: dict[TMCStepper, int]) -> None:
+        # moves complete instantly
+        for stepper, position in targets.items():
+            stepper.position = position
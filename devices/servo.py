@@ -1,14 +1,33 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Mapping
+from logging import getLogger
+from struct import Struct
 from typing import ClassVar
 
-import busio
-from adafruit_motor import servo
-from adafruit_pca9685 import PCA9685
-from board import SCL, SDA
+from smbus2 import SMBus, i2c_msg
 
 __all__ = ('Servo',)
 
+log = getLogger(__name__)
+
+# PCA9685 registers
+_MODE1 = 0x00
+_LED0_ON_L = 0x06
+_PRESCALE = 0xFE
+
+# MODE1 bits
+_RESTART = 0x80
+_AI = 0x20  # register auto-increment
+_SLEEP = 0x10
+
+_UNSET = object()
+
+_FULL_OFF = 0x1000  # OFF count with the full-off bit set, which disables the output
+_LUT_STEPS = 10  # OFF count lookup table entries per degree
+_OFF_REG = Struct('<H')  # LEDn_OFF_L, LEDn_OFF_H
+
 
 class Servo:
     """Interface over a single DS3235 270-degree servo motor controlled using PCA9685.
@@ -23,12 +42,25 @@ class Servo:
         The minimum pulse width in microseconds for the PWM-controlled servo. Default is 500 us.
     max_pulse: int
         The maximum pulse width in microseconds for the PWM-controlled servo. Default is 2500 us.
+
+    Angle updates to several servos can be sent to the PCA9685 together by wrapping them in
+    :meth:`begin_batch` and :meth:`commit_batch`.
+
+    The PCA9685 is driven directly over ``/dev/i2c-1``. It supports fast-mode (400 kHz) I2C, which the
+    Pi's bus only runs at with ``dtparam=i2c_arm_baudrate=400000`` in ``/boot/config.txt``.
     """
 
-    __slots__ = ('channel', 'inner', '_reversed')
+    __slots__ = ('channel', '_reversed', '_range', '_offs', '_prefix', '_min_duty', '_duty_range', '_angle')
 
-    I2C: ClassVar[busio.I2C | None] = None
-    PCA: ClassVar[PCA9685 | None] = None
+    BUS: ClassVar[SMBus | None] = None
+    ADDRESS: ClassVar[int] = 0x40
+    REFERENCE_CLOCK: ClassVar[int] = 25_000_000  # the PCA9685's internal oscillator, in Hz
+    FREQUENCY: ClassVar[float | None] = None
+
+    # pending channel -> 12-bit OFF count while a batch is open
+    _batch: ClassVar[dict[int, int] | None] = None
+    # channel -> the OFF count last written to it, so repeated commands don't touch the bus
+    _written: ClassVar[dict[int, int]] = {}
     
     def __init__(
         self,
@@ -42,38 +74,168 @@ class Servo:
     ) -> None:
         self.prepare()
         self.channel = channel
+        self._prefix: bytes = bytes((_LED0_ON_L + 4 * channel, 0, 0))  # LEDn_ON_L address, then ON = 0
         self._reversed = reverse
+        self._angle: float | None | object = _UNSET  # the last commanded angle
             
-        self.inner = servo.Servo(
-            self.PCA.channels[channel],
-            actuation_range=actuation_range,
-            min_pulse=min_pulse, max_pulse=max_pulse,
+        # same pulse mapping as adafruit_motor, precomputed at 0.1 degree steps (finer than the
+        # PCA9685's ~0.7 degree resolution at these pulse widths)
+        min_duty = self._min_duty = int(min_pulse * self.FREQUENCY / 1_000_000 * 0xFFFF)
+        duty_range = self._duty_range = int(max_pulse * self.FREQUENCY / 1_000_000 * 0xFFFF - min_duty)
+        self._range: int = actuation_range
+        self._offs: tuple[int, ...] = tuple(
+            (min_duty + int(i / (actuation_range * _LUT_STEPS) * duty_range)) >> 4
+            for i in range(actuation_range * _LUT_STEPS + 1)
         )
         if angle is not None:
             self.angle = angle
 
     @classmethod
     def prepare(cls) -> None:
-        """Prepare the I2C interface and PCA9685 instance."""
-        if cls.I2C is None:
-            cls.I2C = busio.I2C(SCL, SDA)
-        if cls.PCA is None:
-            cls.PCA = PCA9685(cls.I2C)
-            cls.PCA.frequency = 50  # 20 ms period for servo control
+        """Prepare the I2C bus and initialize the PCA9685."""
+        if cls.BUS is not None:
+            return
+        try:
+            bus = SMBus(1)
+            cls._set_frequency(bus, 50)  # 20 ms period for servo control
+        except OSError as exc:
+            log.error(f"Failed to initialize PCA9685 at address {cls.ADDRESS}: {exc}")
+            raise RuntimeError(f"PCA9685 initialization failed: {exc}") from exc
+        cls.BUS = bus
+
+    @classmethod
+    def _set_frequency(cls, bus: SMBus, freq: float) -> None:
+        """Set the PCA9685's PWM frequency and turn on register auto-increment.
+
+        Nothing is written if the controller is already awake with this prescale and auto-increment on,
+        e.g. when the program is restarted without power cycling the board.
+        """
+        prescale = int(cls.REFERENCE_CLOCK / 4096 / freq + 0.5) - 1  # 121 for 50 Hz
+        cls.FREQUENCY = cls.REFERENCE_CLOCK / 4096 / (prescale + 1)  # the actual frequency, after rounding
+
+        mode1 = bus.read_byte_data(cls.ADDRESS, _MODE1)
+        if mode1 & (_SLEEP | _AI) == _AI and bus.read_byte_data(cls.ADDRESS, _PRESCALE) == prescale:
+            return
+
+        # the prescaler can only be written while the oscillator is off
+        bus.write_byte_data(cls.ADDRESS, _MODE1, (mode1 & ~_RESTART) | _SLEEP)
+        bus.write_byte_data(cls.ADDRESS, _PRESCALE, prescale)
+        bus.write_byte_data(cls.ADDRESS, _MODE1, _AI)
+        time.sleep(0.0005)  # oscillator start-up, at most 500 us per the datasheet
+        bus.write_byte_data(cls.ADDRESS, _MODE1, _RESTART | _AI)  # resume the PWM outputs
+
+    @classmethod
+    def begin_batch(cls) -> None:
+        """Start collecting angle updates instead of writing each one to the PCA9685 immediately."""
+        cls._batch = {}
+
+    @classmethod
+    def commit_batch(cls) -> None:
+        """Write all angle updates collected since :meth:`begin_batch`.
+
+        Updates to consecutive channels are sent in a single auto-incrementing I2C write.
+        """
+        batch, cls._batch = cls._batch, None
+        if batch:
+            cls._write_offs(batch)
+
+    @classmethod
+    def write_many(cls, angles: Mapping[Servo, float | None]) -> None:
+        """Set the angles of several servos at once, as a single I2C write where their channels are consecutive.
+
+        If a batch is open, the angles are added to it instead. If any angle is out of range, none are set.
+        """
+        offs = {s.channel: s._off_for(angle) for s, angle in angles.items()}
+        if cls._batch is not None:
+            cls._batch.update(offs)
+        elif offs:
+            cls._write_offs(offs)
+        # only once the write has gone through, so a failed one doesn't leave angle reporting it
+        for s, angle in angles.items():
+            s._angle = angle
+
+    @classmethod
+    def _write_offs(cls, offs: dict[int, int]) -> None:
+        """Write channel -> OFF count updates, one auto-incrementing write per run of consecutive channels."""
+        channels = sorted(offs)
+        start = 0
+        for i in range(1, len(channels) + 1):
+            if i == len(channels) or channels[i] != channels[i - 1] + 1:
+                cls._write_run(channels[start], [offs[ch] for ch in channels[start:i]])
+                start = i
+
+    @classmethod
+    def _write_run(cls, first: int, offs: list[int]) -> None:
+        """Write the OFF counts of consecutive channels starting at `first` in one transaction.
+
+        Channels at either end of the run that already have their OFF count are left out; ones in the
+        middle are rewritten, as that is cheaper than splitting the run into separate transactions.
+        """
+        written = cls._written
+        last = first + len(offs) - 1
+        while first <= last and written.get(first) == offs[0]:
+            first += 1
+            offs = offs[1:]
+        while last >= first and written.get(last) == offs[-1]:
+            last -= 1
+            offs = offs[:-1]
+        if not offs:
+            return
+
+        buf = bytearray((_LED0_ON_L + 4 * first,))  # LEDn_ON_L of the first channel
+        for off in offs:
+            buf += bytes((0, 0, off & 0xFF, off >> 8))
+        # a plain I2C write, since SMBus block writes are limited to 32 bytes (8 channels)
+        cls.BUS.i2c_rdwr(i2c_msg.write(cls.ADDRESS, buf))
+        for ch, off in enumerate(offs, first):
+            written[ch] = off
+
+    def _off_count(self, value: float) -> int:
+        """Convert a raw (non-reversed) angle into the 12-bit PCA9685 OFF count."""
+        if not 0 <= value <= self._range:
+            raise ValueError('Angle out of range')
+        return self._offs[round(value * _LUT_STEPS)]
+
+    def _off_for(self, angle: float | None) -> int:
+        """The OFF count for a normalized angle (see :attr:`angle`), accounting for reversal."""
+        if angle is None:
+            return _FULL_OFF
+        if self._reversed:
+            angle = self._range - angle
+        return self._off_count(angle)
 
     @property
     def angle(self) -> float | None:
         """Get the current angle of the servo, normalized between 0 and 270 degrees."""
+        if self._angle is not _UNSET:
+            return self._angle
+
+        # not set since startup; the PCA9685 keeps its outputs across a reset, so read back what it has
+        off = Servo.BUS.read_word_data(Servo.ADDRESS, self._prefix[0] + 2)  # LEDn_OFF_L, LEDn_OFF_H
+        if off & _FULL_OFF:
+            return None
+
+        angle = self._range * ((off << 4) - self._min_duty) / self._duty_range
         if self._reversed:
-            return self.inner.actuation_range - self.inner.angle
-        return self.inner.angle
+            return self._range - angle
+        return angle
     
     @angle.setter
-    def angle(self, value: float) -> None:
-        """Set the angle of the servo, normalized between 0 and 270 degrees."""
-        if self._reversed:
-            value = self.inner.actuation_range - value
-        self.inner.angle = value
+    def angle(self, value: float | None) -> None:
+        """Set the angle of the servo, normalized between 0 and 270 degrees, or None to disable it."""
+        off = self._off_for(value)
+        if Servo._batch is not None:
+            Servo._batch[self.channel] = off
+            self._angle = value
+            return
+        if Servo._written.get(self.channel) == off:
+            self._angle = value
+            return
+
+        # one auto-incrementing write of LEDn_ON_L..LEDn_OFF_H
+        Servo.BUS.i2c_rdwr(i2c_msg.write(Servo.ADDRESS, self._prefix + _OFF_REG.pack(off)))
+        Servo._written[self.channel] = off
+        self._angle = value  # only once the write has gone through
 
     def __repr__(self) -> str:
         return f'Servo(channel={self.channel}, angle={self.angle})'
@@ -1,16 +1,81 @@
 from __future__ import annotations
 
+import asyncio
+import os
+from collections.abc import Sequence
+from concurrent.futures import Future
 from enum import Enum
-from threading import Thread
-from time import sleep
+from logging import getLogger
+from threading import Event, Lock, Thread
+from time import monotonic
 
+import RPi.GPIO as GPIO
 from gpiozero import OutputDevice
 from gpiozero.pins.rpigpio import RPiGPIOFactory
 
+from ._gpiomem import open_gpiomem
+
 __all__ = ('Stepper', 'StepperDirection')
 
+log = getLogger(__name__)
+
 STEPPER_PIN_FACTORY = RPiGPIOFactory()
 
+# All steppers share one event loop on a single background thread, rather than one thread each.
+_LOOP: asyncio.AbstractEventLoop | None = None
+_LOOP_LOCK = Lock()
+
+# SCHED_FIFO priority for the stepper loop thread; above the kernel's default IRQ threads (50)
+_RT_PRIORITY = 80
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the event loop that drives all steppers, starting its thread on first use."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            Thread(target=_run_loop, args=(_LOOP,), name='stepper-loop', daemon=True).start()
+        return _LOOP
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Runs the stepper event loop, under a real-time scheduling policy if the process is allowed one.
+
+    Only this thread is elevated, so step timing is no longer preempted by ordinary processes while the
+    rest of the program (MQTT, camera, LCD) keeps its normal priority. A real-time thread that busy-waits
+    would starve everything else on its core, so with real-time priority :meth:`Stepper._pace` only sleeps.
+    """
+    global _spin_threshold
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(_RT_PRIORITY))
+    except (AttributeError, OSError) as exc:  # not Linux, or lacking CAP_SYS_NICE
+        log.debug(f"Stepper loop running without real-time priority: {exc}")
+    else:
+        _spin_threshold = 0.0
+    loop.run_forever()
+
+# asyncio timeouts go through epoll, which rounds them up to whole milliseconds, so the last stretch
+# before each step's deadline is spun out instead of slept (never more than a quarter of the step delay,
+# so a moving stepper doesn't spend its whole time spinning)
+_SPIN_THRESHOLD = 0.0015
+_spin_threshold = _SPIN_THRESHOLD  # the threshold in effect; 0 once the loop has real-time priority
+
+# one pin energised at a time (wave drive)
+DEFAULT_SEQ_4: tuple[tuple[int, ...], ...] = (
+    (1, 0, 0, 0),
+    (0, 1, 0, 0),
+    (0, 0, 1, 0),
+    (0, 0, 0, 1),
+)
+# two adjacent pins energised at a time (full-step drive)
+NEMA17_SEQ: tuple[tuple[int, ...], ...] = (
+    (1, 1, 0, 0),
+    (0, 1, 1, 0),
+    (0, 0, 1, 1),
+    (1, 0, 0, 1),
+)
+
 
 class StepperDirection(Enum):
     cw = -1  # Clockwise
@@ -24,7 +89,7 @@ class Stepper:
     ----------
     *pins: int
         The GPIO pins connected to the stepper motor.
-    seq: list[list[int]] | None
+    seq: Sequence[Sequence[int]] | None
         The sequence of steps to perform. If None, a default sequence is used.
     steps_per_revolution: int
         The number of steps per revolution for the stepper motor.
@@ -40,17 +105,24 @@ class Stepper:
     
     __slots__ = (
         'pins',
-        'seq',
+        '_pin_numbers',
+        '_gpio_output',
+        '_seq',
+        '_step_args',
+        '_seq_len',
         'steps',
-        'target',
+        '_target',
         'steps_per_revolution',
         'accel_steps',
         '_delay',
         '_max_delay',
-        'direction',
-        '_worker',
+        '_direction',
+        '_dir_value',
+        '_task',
         '_worker_keepalive',
         '_worker_busy',
+        '_idle_event',
+        '_wake_event',
     )
     
     _delay: float
@@ -58,24 +130,30 @@ class Stepper:
     def __init__(
         self,
         *pins: int,
-        seq: list[list[int]] | None = None,
+        seq: Sequence[Sequence[int]] | None = None,
         steps_per_revolution: int = 200,
         delay: float = 0.001,
         accel_steps: int = 100,
         max_delay: float = 0.007,
         direction: StepperDirection = StepperDirection.ccw,
     ) -> None:
-        count = len(pins)
-        assert count == 4, 'only 4-pin steppers are supported'
+        if len(pins) != 4:
+            raise ValueError('only 4-pin steppers are supported')
         self.pins: list[OutputDevice] = [
             OutputDevice(pin, pin_factory=STEPPER_PIN_FACTORY) for pin in pins
         ]
+        # the OutputDevice wrappers claim the pins and handle teardown, but each step writes all
+        # pins at once, through the GPIO set/clear registers where the board allows it and
+        # otherwise in one RPi.GPIO call, rather than going through each wrapper's value setter
+        self._pin_numbers: tuple[int, ...] = pins
+        gpiomem = open_gpiomem() if max(pins) < 32 else None
+        self._gpio_output = GPIO.output if gpiomem is None else gpiomem.write
 
-        if seq is None:
-            seq = [[int(i == j) for j in range(count)] for i in range(count)]
-        self.seq = seq
+        self.seq = DEFAULT_SEQ_4 if seq is None else seq
         
         self.steps: int = -1
+        self._task: Future | None = None
+        self._wake_event: asyncio.Event = asyncio.Event()
         self.target: int | None = None
         self.direction: StepperDirection = direction
         
@@ -84,12 +162,13 @@ class Stepper:
         self.delay = delay
         self._max_delay = max_delay
         
-        self._worker: Thread | None = None
         self._worker_keepalive: bool = False
         self._worker_busy: bool = False
+        self._idle_event: Event = Event()
+        self._idle_event.set()
 
     @property
-    def delay(self) -> int:
+    def delay(self) -> float:
         """The delay between steps, in seconds."""
         return self._delay
     
@@ -99,90 +178,176 @@ class Stepper:
         if value < 0:
             raise ValueError('Delay must be non-negative')
         self._delay = value
+
+    @property
+    def target(self) -> int | None:
+        """The target step count, or None to run continuously."""
+        return self._target
+
+    @target.setter
+    def target(self, value: int | None) -> None:
+        """Sets the target step count, waking the update loop if it is idle."""
+        self._target = value
+        if self._task is not None:
+            # the event belongs to the stepper loop, so it must be set from that thread
+            _get_loop().call_soon_threadsafe(self._wake_event.set)
+
+    @property
+    def seq(self) -> Sequence[Sequence[int]]:
+        """The sequence of pin configurations to step through."""
+        return self._seq
+
+    @seq.setter
+    def seq(self, value: Sequence[Sequence[int]]) -> None:
+        """Sets the step sequence, caching the output call arguments for each row for :meth:`step`."""
+        self._seq = value
+        if self._gpio_output is GPIO.output:
+            self._step_args = tuple((self._pin_numbers, tuple(row)) for row in value)
+        else:
+            # (set mask, clear mask) for the GPIO registers
+            self._step_args = tuple(
+                (
+                    sum(1 << pin for pin, level in zip(self._pin_numbers, row) if level),
+                    sum(1 << pin for pin, level in zip(self._pin_numbers, row) if not level),
+                )
+                for row in value
+            )
+        self._seq_len = len(value)
+
+    @property
+    def direction(self) -> StepperDirection:
+        """The direction the stepper motor is turning."""
+        return self._direction
+
+    @direction.setter
+    def direction(self, value: StepperDirection) -> None:
+        """Sets the direction, caching its step increment for :meth:`step`."""
+        self._direction = value
+        self._dir_value = value.value
         
     @property
     def is_busy(self) -> bool:
         """Returns whether the stepper motor is currently busy."""
         return (
-            self._worker is not None 
-            and self._worker.is_alive() 
+            self._task is not None
+            and not self._task.done()
             and self._worker_busy
         )
 
     def wait(self) -> None:
         """Waits for the stepper to finish its current operation."""
-        while self.is_busy:
-            sleep(0.1)
+        self._idle_event.wait()
 
     def step(self) -> None:
         """Performs one single step."""
-        self.steps += self.direction.value
-        configuration = self.seq[self.steps % len(self.seq)]
-        
-        for pin, value in zip(self.pins, configuration):
-            pin.value = value
+        self.steps += self._dir_value
+        self._gpio_output(*self._step_args[self.steps % self._seq_len])
             
     def start(self) -> None:
-        """Starts the stepper motor update loop in a separate thread."""
-        if self._worker is not None and self._worker.is_alive():
+        """Starts the stepper motor update loop as a task on the shared stepper event loop."""
+        if self._task is not None and not self._task.done():
             raise RuntimeError('Stepper motor is already running')
         
         self._worker_keepalive = True
-        self._worker = Thread(target=self.loop, daemon=True)
-        self._worker.start()
+        self._task = asyncio.run_coroutine_threadsafe(self._run(), _get_loop())
         
     def stop(self) -> None:
         """Gracefully stops the stepper motor update loop."""
-        if self._worker is None or not self._worker.is_alive():
+        if self._task is None or self._task.done():
             raise RuntimeError('Stepper motor is not running')
         
-        self.target = None
         self._worker_keepalive = False
-        self._worker.join()
-        self._worker = None
+        self.target = None
+        self._task.result()
+        self._task = None
+        self._worker_busy = False
+        self._idle_event.set()
         self.steps = -1
             
-    def loop(self) -> None:
+    @staticmethod
+    async def _pace(deadline: float, delay: float) -> float:
+        """Sleeps until `delay` seconds past `deadline` and returns the new deadline.
+
+        Scheduling against a monotonic deadline keeps sleep jitter from accumulating into drift.
+        If the loop has fallen behind, the deadline is reset to now instead of trying to catch up.
+        The final :data:`_SPIN_THRESHOLD` seconds, or a quarter of `delay` if that is shorter, are
+        busy-waited (still yielding to the other steppers on the loop) to make up for epoll's millisecond
+        timeouts. Once the loop thread has real-time priority (see :func:`_run_loop`, which requires root
+        or CAP_SYS_NICE) it sleeps the whole way instead, as its wakeups are no longer delayed by other work.
+        """
+        deadline += delay
+        now = monotonic()
+        slack = deadline - now
+        if slack <= 0:
+            return now
+
+        spin = min(_spin_threshold, delay / 4)
+        if slack > spin:
+            await asyncio.sleep(slack - spin)
+        while monotonic() < deadline:
+            await asyncio.sleep(0)
+        return deadline
+
+    def _schedule(self, steps: int) -> list[float]:
+        """Precomputes the per-step delays for a move of `steps` steps.
+
+        The delay ramps linearly from the base delay down to :attr:`delay` over :attr:`accel_steps` steps,
+        cruises, then ramps back up symmetrically. Moves too short to reach full speed get a shorter ramp.
+        """
+        delay = self.delay
+        n_ramp = min(self.accel_steps, steps // 2)
+        delay_step = (self._max_delay - delay) / self.accel_steps
+        ramp = [max(delay, self._max_delay - delay_step * (i + 1)) for i in range(n_ramp)]
+        return ramp + [delay] * (steps - 2 * n_ramp) + ramp[::-1]
+
+    async def _run(self) -> None:
         """Continuously runs the motor until stopped."""
-        current_delay = self._max_delay
-        delay_step = (current_delay - self.delay) / self.accel_steps
+        try:
+            current_delay = self._max_delay
+            delay_step = (current_delay - self.delay) / self.accel_steps
+            deadline = monotonic()
         
-        while self._worker_keepalive:
-            if self.target is None:
-                self._worker_busy = True
-                # Continuous mode
-                if current_delay > self.delay:
-                    current_delay -= delay_step
-                else:
-                    current_delay = self.delay
-                self.step()
-                sleep(current_delay)
-                continue
+            while self._worker_keepalive:
+                if self.target is None:
+                    self._idle_event.clear()
+                    self._worker_busy = True
+                    # Continuous mode
+                    if current_delay > self.delay:
+                        current_delay -= delay_step
+                    else:
+                        current_delay = self.delay
+                    self.step()
+                    deadline = await self._pace(deadline, current_delay)
+                    continue
                 
-            # Target mode
-            remaining = self.target - self.steps
-            if remaining == 0:
-                self._worker_busy = False
-                sleep(self.delay)
-                continue
-            
-            self._worker_busy = True
-            self.direction = (
-                StepperDirection.ccw if remaining > 0 else StepperDirection.cw
-            )
-            remaining = abs(remaining)
+                # Target mode
+                remaining = self.target - self.steps
+                if remaining == 0:
+                    self._worker_busy = False
+                    self._idle_event.set()
+                    # block until a new target is assigned or the loop is stopped
+                    await self._wake_event.wait()
+                    self._wake_event.clear()
+                    deadline = monotonic()
+                    continue
             
-            for i in range(remaining):
-                if i < self.accel_steps:
-                    current_delay -= delay_step
-                elif i > remaining - self.accel_steps:
-                    current_delay += delay_step
-                else:
-                    current_delay = self.delay
-                    
-                current_delay = max(self.delay, current_delay)
-                self.step()
-                sleep(current_delay)
+                self._idle_event.clear()
+                self._worker_busy = True
+                self.direction = (
+                    StepperDirection.ccw if remaining > 0 else StepperDirection.cw
+                )
+                # step() inlined, with everything it looks up bound once per move
+                output, step_args, seq_len = self._gpio_output, self._step_args, self._seq_len
+                inc, pace = self._dir_value, self._pace
+                for d in self._schedule(abs(remaining)):
+                    self.steps += inc
+                    output(*step_args[self.steps % seq_len])
+                    deadline = await pace(deadline, d)
+                current_delay = self._max_delay
+        finally:
+            # also reached if a step raises, so wait() never blocks on a loop that has died
+            self._worker_busy = False
+            self._idle_event.set()
                 
     def __enter__(self) -> Stepper:
         self.start()
@@ -201,12 +366,7 @@ class Nema17Stepper(Stepper):
     def __init__(self, *pins: int, **kwargs) -> None:
         super().__init__(
             *pins,
-            seq=[
-                [1, 1, 0, 0],
-                [0, 1, 1, 0],
-                [0, 0, 1, 1],
-                [1, 0, 0, 1],
-            ],
+            seq=NEMA17_SEQ,
             steps_per_revolution=200,
             **kwargs,
         )
@@ -2,10 +2,55 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+from threading import Barrier, BrokenBarrierError, Lock, Thread
+
 from tmc_driver.tmc_2209 import *
 
 __all__ = ('TMCStepper',)
 
+# Drivers wired to the same UART share one TmcComUart, along with the number of drivers using it so it is
+# only closed once the last one is deinitialized. The lock guards the cache and also serialises every
+# exchange over the link, since the single-wire UART is half-duplex and shared by all of its drivers.
+_UART_CACHE: dict[str, tuple[TmcComUart, int]] = {}
+_UART_LOCK = Lock()
+
+_HOLD_CURRENT_MULTIPLIER = 0.3
+
+
+def _get_uart(uart: str | TmcComUart) -> TmcComUart:
+    """Returns the shared TmcComUart for the given device path, opening it on first use."""
+    if not isinstance(uart, str):
+        return uart
+    with _UART_LOCK:
+        com, users = _UART_CACHE.get(uart, (None, 0))
+        if com is None:
+            com = TmcComUart(uart)
+        _UART_CACHE[uart] = com, users + 1
+        return com
+
+
+def _release_uart(uart: str) -> bool:
+    """Drops one user of the shared TmcComUart for `uart`, returning whether it was the last one.
+
+    Must be called with :data:`_UART_LOCK` held.
+    """
+    com, users = _UART_CACHE[uart]
+    if users > 1:
+        _UART_CACHE[uart] = com, users - 1
+        return False
+    del _UART_CACHE[uart]
+    return True
+
+
+def _run_synchronized(barrier: Barrier, motion_control: TmcMotionControlStepDir, steps: int) -> None:
+    """Movement thread body that waits for every motor in the same command before taking its first step."""
+    try:
+        barrier.wait()
+    except BrokenBarrierError:
+        return
+    motion_control.run_to_position_steps(steps, MovementAbsRel.ABSOLUTE)
+
 
 class TMCStepper:
     """Interface for a TMC stepper motor.
@@ -18,8 +63,9 @@ class TMCStepper:
         The GPIO pin used to send step signals to the stepper motor.
     dir_pin: int
         The GPIO pin used to set the direction of the stepper motor.
-    uart: str
-        The UART device to use for communication with the TMC driver.
+    uart: str | TmcComUart
+        The UART device to use for communication with the TMC driver, or an already opened TmcComUart.
+        Drivers given the same device path share a single TmcComUart.
         Defaults to '/dev/serial0'.
     reverse: bool
         Whether to reverse the direction of the stepper motor.
@@ -30,9 +76,18 @@ class TMCStepper:
     steps_per_revolution: int
         The number of full steps per revolution for the stepper motor.
         Defaults to 200 steps (1.8 degrees per step).
+
+    Notes
+    -----
+    Only the constructor, :meth:`set_current` and :meth:`deinit` talk to the driver over the UART, and each
+    holds the shared UART lock for its whole exchange. Enabling, disabling and moving only drive the EN and
+    STEP/DIR pins, and the speed, acceleration and position properties are motion-control state on this side.
     """
     
-    __slots__ = ('_tmc', 'pulley_circumference', '_reverse')
+    __slots__ = (
+        '_tmc', 'pulley_circumference', '_reverse', '_enabled', '_stopped', '_uart', '_deinitialized',
+        '_move_thread',
+    )
 
     def __init__(
         self,
@@ -40,43 +95,105 @@ class TMCStepper:
         step_pin: int,
         dir_pin: int,
         *,
-        uart: str = '/dev/serial0',
+        uart: str | TmcComUart = '/dev/serial0',
         reverse: bool = False,
         current: int = 1500,
         steps_per_revolution: int = 200,
     ) -> None:
-        self._tmc: Tmc2209 = Tmc2209(
-            TmcEnableControlPin(control_pin),
-            TmcMotionControlStepDir(step_pin, dir_pin),
-            TmcComUart(uart),
-        )
-        self._tmc.set_direction_reg(False)
-        self._tmc.set_current(current, hold_current_multiplier=0.3)
-        self._tmc.set_interpolation(True)
-        self._tmc.set_spreadcycle(True)
-        self._tmc.set_microstepping_resolution(16)
-        self._tmc.set_internal_rsense(False)
-        self._tmc.acceleration_fullstep = 2000
-        self._tmc.max_speed_fullstep = 100
-        self._tmc.fullsteps_per_rev = steps_per_revolution
+        # the device path if the TmcComUart is shared through the cache, or None if the caller owns it
+        self._uart: str | None = uart if isinstance(uart, str) else None
+        self._deinitialized: bool = False
+        com = _get_uart(uart)
+        with _UART_LOCK:
+            self._tmc: Tmc2209 = Tmc2209(
+                TmcEnableControlPin(control_pin),
+                TmcMotionControlStepDir(step_pin, dir_pin),
+                com,
+            )
+            self._init_registers(microsteps=16)
+            self._tmc.set_current(current, hold_current_multiplier=_HOLD_CURRENT_MULTIPLIER)
+            self._tmc.acceleration_fullstep = 2000
+            self._tmc.max_speed_fullstep = 100
+            self._tmc.fullsteps_per_rev = steps_per_revolution
         self._reverse: int = -1 if reverse else 1
+        # last commanded states, so redundant UART writes can be skipped
+        self._enabled: bool | None = None
+        self._stopped: bool = True
+        self._move_thread: Thread | None = None  # the thread running the current asynchronous move, if any
         self.enable()
 
+    def _init_registers(self, *, microsteps: int) -> None:
+        """Configures GCONF and CHOPCONF with one read and one checked write each.
+
+        This is equivalent to calling ``set_direction_reg(False)``, ``set_spreadcycle(True)``,
+        ``set_internal_rsense(False)``, ``set_interpolation(True)`` and ``set_microstepping_resolution()``,
+        each of which would otherwise perform its own read-modify-write round trip over UART.
+        """
+        gconf = self._tmc.gconf
+        gconf.read()
+        gconf.shaft = False
+        gconf.en_spreadcycle = True
+        gconf.internal_rsense = False
+        gconf.mstep_reg_select = True  # microstep resolution is set through CHOPCONF below
+        gconf.write_check()
+
+        chopconf = self._tmc.chopconf
+        chopconf.read()
+        chopconf.intpol = True
+        chopconf.mres_ms = microsteps
+        chopconf.write_check()
+        self._tmc.tmc_mc.mres = microsteps
+
+    def set_current(self, current: int) -> None:
+        """Sets the run current in mA, with the hold current at the same fraction of it as on construction."""
+        with _UART_LOCK:
+            self._tmc.set_current(current, hold_current_multiplier=_HOLD_CURRENT_MULTIPLIER)
+
+    def deinit(self) -> None:
+        """Disables the motor and releases its pins. Does nothing if it has already been deinitialized.
+
+        The UART is only closed if it was opened from a device path and no other driver still uses it;
+        a TmcComUart passed in by the caller is left for the caller to close.
+        """
+        if self._deinitialized:
+            return
+        with _UART_LOCK:
+            if self._uart is None or not _release_uart(self._uart):
+                self._tmc.tmc_com = None  # so the library's deinit leaves the shared link open
+            self._tmc.deinit()
+        self._deinitialized = True
+        self._enabled = False
+
     def enable(self) -> None:
-        """Enables the stepper motor."""
+        """Enables the stepper motor. Does nothing if it is already enabled.
+
+        This only drives the EN pin (``TmcEnableControlPin``); it sends no register writes over UART.
+        """
+        if self._enabled is True:
+            return
         self._tmc.set_motor_enabled(True)
+        self._enabled = True
 
     def disable(self) -> None:
-        """Disables the stepper motor."""
+        """Disables the stepper motor. Does nothing if it is already disabled.
+
+        Like :meth:`enable`, this is a single EN pin write.
+        """
+        if self._enabled is False:
+            return
         self._tmc.set_motor_enabled(False)
+        self._enabled = False
 
     def run_to_position(self, position: int) -> None:
         """Moves the stepper motor to an absolute position in steps, blocking the main thread."""
+        self._stopped = False
         self._tmc.run_to_position_steps(position * self._reverse)
 
     def wait(self) -> None:
         """Waits for the stepper motor to finish its current operation."""
-        self._motion_control.wait_for_movement_finished_threaded()
+        thread = self._move_thread
+        if thread is not None:
+            thread.join()
 
     @property
     def _motion_control(self) -> TmcMotionControlStepDir:
@@ -95,7 +212,35 @@ class TMCStepper:
     @target.setter
     def target(self, position: int) -> None:
         """Sets the target position for the stepper motor such that it runs async."""
-        self._motion_control.run_to_position_steps_threaded(position * self._reverse, MovementAbsRel.ABSOLUTE)
+        self._stopped = False
+        # the same as the library's run_to_position_steps_threaded(), but with the thread kept here, so
+        # wait() doesn't depend on how the library keeps track of its movement thread
+        self._move_thread = Thread(
+            target=self._motion_control.run_to_position_steps,
+            args=(position * self._reverse, MovementAbsRel.ABSOLUTE),
+        )
+        self._move_thread.start()
+
+    @classmethod
+    def set_targets(cls, targets: Mapping[TMCStepper, int]) -> None:
+        """Sets the target positions of several stepper motors in steps, such that they all start moving together.
+
+        Setting each :attr:`target` in turn starts each motor's movement thread as soon as it is created, so
+        the first motor is already stepping while the next thread is being spun up. Here every movement
+        thread is started first and then held at a barrier until all of them are ready.
+        """
+        barrier = Barrier(len(targets))
+        try:
+            for stepper, position in targets.items():
+                stepper._stopped = False
+                stepper._move_thread = Thread(
+                    target=_run_synchronized,
+                    args=(barrier, stepper._motion_control, position * stepper._reverse),
+                )
+                stepper._move_thread.start()
+        except BaseException:
+            barrier.abort()  # release the threads that did start, rather than leave them waiting forever
+            raise
 
     @property
     def speed(self) -> int:
@@ -112,14 +257,37 @@ class TMCStepper:
         """Sets the target speed of the stepper motor, in fullsteps/sec."""
         self._motion_control.max_speed_fullstep = speed * self._reverse
 
+    @property
+    def max_speed(self) -> int:
+        """Returns the unsigned maximum speed of the stepper motor, in fullsteps/sec, whatever the motor's direction."""
+        return self._motion_control.max_speed_fullstep
+
+    @max_speed.setter
+    def max_speed(self, speed: int) -> None:
+        """Sets the unsigned maximum speed of the stepper motor, in fullsteps/sec."""
+        self._motion_control.max_speed_fullstep = speed
+
+    @property
+    def acceleration(self) -> int:
+        """Returns the acceleration of the stepper motor, in fullsteps/sec^2."""
+        return self._motion_control.acceleration_fullstep
+
+    @acceleration.setter
+    def acceleration(self, acceleration: int) -> None:
+        """Sets the acceleration of the stepper motor, in fullsteps/sec^2."""
+        self._motion_control.acceleration_fullstep = acceleration
+
     @property
     def steps_per_revolution(self) -> int:
         """Returns the number of full steps per revolution."""
         return self._motion_control.fullsteps_per_rev
     
     def stop(self) -> None:
-        """Stops motion control of the stepper motor."""
+        """Stops motion control of the stepper motor. Does nothing if it is already stopped and at rest."""
+        if self._stopped and self.speed == 0:
+            return
         self._motion_control.stop()
+        self._stopped = True
 
     def __enter__(self) -> TMCStepper:
         self.enable()
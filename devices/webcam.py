@@ -1,36 +1,103 @@
 from __future__ import annotations
 
 import logging
-from threading import Thread
+import os
+import sys
+import zlib
+from threading import Condition, Event, Thread
 
 import cv2
 
 logger = logging.getLogger(__name__)
 
+# V4L2 directly, rather than whichever backend OpenCV picks first (e.g. GStreamer), so the buffer size
+# and MJPEG passthrough settings below are actually honoured
+_BACKEND = cv2.CAP_V4L2 if sys.platform.startswith('linux') else cv2.CAP_ANY
+
+# Frames are too small for OpenCV's worker pool to speed up resizing or encoding, and its threads would
+# only compete with the stepper threads for the Pi's cores
+cv2.setNumThreads(1)
+
+# Low bits dropped from each fingerprint cell, so residual noise in the 8x8 average doesn't change the hash
+_FINGERPRINT_SHIFT = 4
+
+
+def _pin_to_last_cpu() -> None:
+    """Restricts the calling thread to the highest-numbered CPU, leaving the others to the motion threads.
+
+    Does nothing on machines with two CPUs or fewer, or where affinity can't be set.
+    """
+    try:
+        cpus = os.sched_getaffinity(0)
+        if len(cpus) > 2:
+            os.sched_setaffinity(0, {max(cpus)})
+    except (AttributeError, OSError) as exc:
+        logger.debug("Could not set webcam thread affinity: %s", exc)
+
 
 class WebcamKeepAlive(Thread):
-    def __init__(self, camera: cv2.VideoCapture, *, thread_name='webcam-thread') -> None:
+    def __init__(self, camera: cv2.VideoCapture, *, thread_name='webcam-thread', timeout: float = 1.0) -> None:
         self._camera: cv2.VideoCapture = camera
-        self._last_frame = None
-        self._run: bool = True
-        super(WebcamKeepAlive, self).__init__(name=thread_name)
+        self._timeout: float = timeout
+        self._stop_event: Event = Event()
+        # read() raises _wanted and waits on _cond for _seq to move on, at which point _frame holds its result
+        self._cond: Condition = Condition()
+        self._wanted: bool = False
+        self._seq: int = 0
+        self._frame: tuple[bool, cv2.Mat | None] = (False, None)
+        # a daemon, so a grab() stuck on an unresponsive camera can't keep the process alive on exit
+        super(WebcamKeepAlive, self).__init__(name=thread_name, daemon=True)
         self.start()
 
     def run(self):
-        while self._run:
-            ret, self._last_frame = self._camera.read()
+        # With a one-frame driver buffer, grab() blocks until the camera delivers the next frame, so this
+        # loop idles between frames. A failing grab() (e.g. the camera was unplugged) returns at once, so it
+        # backs off instead of spinning a core. Frames are only decoded when someone is waiting for one, and
+        # only this thread ever touches the capture.
+        _pin_to_last_cpu()
+        grab, retrieve = self._camera.grab, self._camera.retrieve
+        is_stopped, backoff = self._stop_event.is_set, self._stop_event.wait
+        while not is_stopped():
+            if not grab():
+                backoff(0.1)
+                continue
+            if self._wanted:
+                self._deliver(retrieve())
+
+    def _deliver(self, result: tuple[bool, cv2.Mat | None]) -> None:
+        """Hands `result` to every read() currently waiting."""
+        with self._cond:
+            self._frame = result
+            self._wanted = False
+            self._seq += 1
+            self._cond.notify_all()
+
+    def read(self) -> tuple[bool, cv2.Mat | None]:
+        """Waits for the next frame from the camera, so the same frame is never returned twice.
 
-    def read(self) -> tuple[bool, cv2.Mat]:
-        if self._last_frame is None:
-            return self._camera.read()
-        return True, self._last_frame
+        Returns ``(False, None)`` if no frame arrives within the timeout.
+        """
+        with self._cond:
+            seq = self._seq
+            self._wanted = True
+            if not self._cond.wait_for(lambda: self._seq != seq, self._timeout):
+                return False, None
+            return self._frame
 
     def release(self) -> None:
         """Release the camera resources"""
-        self._run = False
+        self._stop_event.set()
+        self._deliver((False, None))  # don't leave readers waiting out their timeout
         if not self._camera:
             logger.warning("No webcam to release")
+            return
 
+        # let the in-flight grab() finish before the capture is torn down underneath it
+        self.join(self._timeout)
+        if self.is_alive():
+            # releasing now could free the capture mid-grab(), so leave it to be closed on exit
+            logger.warning("Webcam thread did not stop in time, not releasing the camera")
+            return
         self._camera.release()
         self._camera = None
         logger.info("Webcam released")
@@ -55,6 +122,14 @@ class Webcam:
         The frames per second for webcam stream (default is 5).
         This is the rate at which the webcam streams in frames, but not necessarily the rate at which images are
         captured then processed.
+    hardware_jpeg: bool
+        Whether to have the camera deliver MJPEG frames that are passed through as-is, instead of decoding
+        and re-encoding each frame in software (default is True). Falls back to software encoding if the
+        camera or capture backend doesn't support it. `image_quality` only applies to software encoding, which
+        is also used when the camera can't deliver frames at the resize dimensions.
+    grayscale: bool
+        Whether to encode single-channel (luminance only) JPEGs, which are about a third of the size
+        (default is False). Always encodes in software.
     """
     
     _capture: cv2.VideoCapture
@@ -67,66 +142,182 @@ class Webcam:
         resize_width: int | None = 360,
         resize_height: int | None = 270,
         fps: int = 5,
+        hardware_jpeg: bool = True,
+        grayscale: bool = False,
     ) -> None:
         self.webcam_index: int = webcam_index
         self.image_quality: int = image_quality
         self.resize_width: int | None = resize_width
         self.resize_height: int | None = resize_height
         self.fps: int = fps
+        self.hardware_jpeg: bool = hardware_jpeg
+        self.grayscale: bool = grayscale
         
         self._keepalive: WebcamKeepAlive | None = None
         self._capture: cv2.VideoCapture | None = None
+        # Opening a capture can take seconds while the backend probes the camera, so it starts right away
+        # in the background and prepare() picks it up, overlapping the open with the rest of startup
+        self._opened: cv2.VideoCapture | None = None
+        self._opening: Thread | None = Thread(target=self._open, name='webcam-open', daemon=True)
+        self._opening.start()
+        self._raw_jpeg: bool = False  # whether frames read from the camera are already JPEG bytes
+        self._needs_resize: bool = False  # whether the camera couldn't be set to the resize dimensions
+        # (width, height) to resize frames to, and the imencode parameters; both fixed by prepare()
+        self._resize_size: tuple[int, int] | None = None
+        self._encode_params: list[int] = []
+        self._resized: cv2.Mat | None = None  # reused as the destination of every resize in encode()
+
+    def _open(self) -> None:
+        try:
+            self._opened = cv2.VideoCapture(self.webcam_index, _BACKEND)
+        except (cv2.error, OSError) as e:
+            logger.error("Error opening camera in the background: %s", e)
 
     def prepare(self) -> bool:
         """Initialize the webcam"""
         try:
-            camera = cv2.VideoCapture(self.webcam_index)
+            camera = None
+            if self._opening is not None:
+                self._opening.join()
+                camera, self._opened, self._opening = self._opened, None, None
+            if camera is None:  # prepared again after a release, or the background open failed
+                camera = cv2.VideoCapture(self.webcam_index, _BACKEND)
             if not camera.isOpened():
-                logger.error(f"Failed to open camera at index {self.webcam_index}")
+                logger.error("Failed to open camera at index %d", self.webcam_index)
                 return False
+            # don't let stale frames queue up in the driver
+            if not camera.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                logger.warning("Capture backend does not support setting the buffer size, frames may lag")
+            # before the resolution, since V4L2 renegotiates the frame size when the pixel format changes
+            self._raw_jpeg = self.hardware_jpeg and self._enable_raw_jpeg(camera)
     
+            self._resize_size = (
+                (self.resize_width, self.resize_height) if self.resize_width and self.resize_height else None
+            )
+            self._encode_params = [cv2.IMWRITE_JPEG_QUALITY, self.image_quality]
+
             # Set camera properties for better performance
-            camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resize_width)
-            camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resize_height)
+            self._needs_resize = False
+            if self._resize_size:
+                camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.resize_width)
+                camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resize_height)
+                # the driver silently falls back to the nearest supported mode, leaving every frame to be resized
+                size = int(camera.get(cv2.CAP_PROP_FRAME_WIDTH)), int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                self._needs_resize = size != self._resize_size
+                if self._needs_resize:
+                    logger.warning(
+                        "Camera does not support %dx%d, using %dx%d (frames will be resized in software)",
+                        self.resize_width, self.resize_height, *size,
+                    )
+            # frames are paced by the camera itself (read() blocks until the next one), so check it took the rate
             camera.set(cv2.CAP_PROP_FPS, self.fps)
-            self._keepalive = WebcamKeepAlive(camera)
+            fps = camera.get(cv2.CAP_PROP_FPS)
+            if fps and round(fps) != self.fps:
+                logger.warning("Camera does not support %d fps, streaming at %g fps", self.fps, fps)
+            # give read() a few frame periods at the rate the camera actually streams at before it gives up
+            self._keepalive = WebcamKeepAlive(camera, timeout=max(1.0, 3 / (fps or self.fps)))
             self._capture = camera
     
             logger.info("Camera initialized successfully")
             return True
-        except Exception as e:
-            logger.error(f"Error setting up camera: {e}")
+        except (cv2.error, OSError) as e:
+            logger.error("Error setting up camera: %s", e)
             return False
 
-    def capture(self) -> bytes | None:
-        """Capture an image from the webcam"""
+    @staticmethod
+    def _enable_raw_jpeg(camera: cv2.VideoCapture) -> bool:
+        """Switches the camera to MJPEG and turns off decoding, so each read() returns the JPEG buffer."""
+        mjpg = cv2.VideoWriter_fourcc(*'MJPG')
+        if not camera.set(cv2.CAP_PROP_FOURCC, mjpg) or int(camera.get(cv2.CAP_PROP_FOURCC)) != mjpg:
+            logger.info("Camera does not support MJPEG, encoding frames in software")
+            return False
+        if not camera.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+            logger.info("Capture backend cannot pass MJPEG frames through, encoding frames in software")
+            return False
+
+        logger.info("Using camera MJPEG frames directly")
+        return True
+
+    def read(self) -> cv2.Mat | None:
+        """Grab the latest frame from the webcam, without encoding it"""
         if self._keepalive is None or not self._keepalive.is_alive():
             logger.error("Webcam is not initialized or has been released")
             return None
-        
-        try:
-            ret, frame = self._keepalive.read()
-            if not ret:
-                logger.error("Failed to capture image from camera")
-                return None
 
-            height, width, _ = frame.shape
+        ret, frame = self._keepalive.read()
+        if not ret:
+            logger.error("Failed to capture image from camera")
+            return None
+        return frame
+
+    def fingerprint(self, frame: cv2.Mat) -> int:
+        """A cheap hash of a frame's content, for telling repeated frames of a static scene apart from new ones
+
+        The frame is reduced to 8x8 luma, averaging away sensor noise, and only its top bits are hashed.
+        """
+        if self._raw_jpeg:
+            # libjpeg decodes at 1/8 scale straight from the DC coefficients, far cheaper than a full decode
+            gray = cv2.imdecode(frame, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+            if gray is None:
+                return zlib.crc32(frame)  # corrupt; never matches a good frame
+            small = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA)
+        else:
+            small = cv2.cvtColor(cv2.resize(frame, (8, 8), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        return zlib.crc32(small >> _FINGERPRINT_SHIFT)
+
+    def _encode(self, frame: cv2.Mat) -> cv2.Mat | None:
+        """Resize a frame if needed and encode it as JPEG, returning the array holding the JPEG bytes"""
+        if self._raw_jpeg and not self._needs_resize and not self.grayscale:
+            return frame  # already a JPEG at the requested resolution
+
+        try:
+            if self._raw_jpeg:
+                # libjpeg skips the chroma planes entirely when decoding straight to grayscale
+                frame = cv2.imdecode(frame, cv2.IMREAD_GRAYSCALE if self.grayscale else cv2.IMREAD_COLOR)
+                if frame is None:
+                    logger.error("Camera delivered a corrupt JPEG frame")
+                    return None
+            elif self.grayscale:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # before resizing, so only one channel is resized
             # Resize image if specified
-            if (
-                self.resize_width and self.resize_height
-                and self.resize_width != width and self.resize_height != height
-            ):
-                frame = cv2.resize(frame, (self.resize_width, self.resize_height))
+            size = self._resize_size
+            if size and size != (frame.shape[1], frame.shape[0]):
+                frame = self._resized = cv2.resize(frame, size, dst=self._resized)
 
-            # Encode image as JPEG
-            encode_params = [cv2.IMWRITE_JPEG_QUALITY, self.image_quality]
-            _, buffer = cv2.imencode('.jpg', frame, encode_params)
+            # Encode image as JPEG (single-component for grayscale frames)
+            _, buffer = cv2.imencode('.jpg', frame, self._encode_params)
+            return buffer
 
-            return buffer.tobytes()
+        except cv2.error as e:
+            logger.error("Error encoding image: %s", e)
+            return None
+
+    def encode(self, frame: cv2.Mat) -> bytes | None:
+        """Resize a frame if needed and encode it as JPEG"""
+        buffer = self._encode(frame)
+        return None if buffer is None else buffer.tobytes()
+
+    def encode_view(self, frame: cv2.Mat) -> memoryview | None:
+        """Like :meth:`encode`, but returns a view of the JPEG bytes instead of copying them into a bytes object.
+
+        For consumers that accept the buffer protocol, e.g. ``socket.send``; paho's ``publish`` does not.
+        """
+        buffer = self._encode(frame)
+        return None if buffer is None else memoryview(buffer.reshape(-1))
+
+    def capture(self) -> bytes | None:
+        """Capture an image from the webcam"""
+        frame = self.read()
+        if frame is None:
+            return None
+        return self.encode(frame)
 
-        except Exception as e:
-            logger.error(f"Error capturing image: {e}")
+    def capture_view(self) -> memoryview | None:
+        """Capture an image from the webcam, as a view of the JPEG bytes (see :meth:`encode_view`)"""
+        frame = self.read()
+        if frame is None:
             return None
+        return self.encode_view(frame)
 
     def release(self) -> None:
         """Release the webcam resources"""
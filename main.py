@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import datetime
 import logging
+import queue
 import ssl
-import time
 from enum import Enum
 from os import getenv
-from threading import Thread
+from threading import Event, Thread
+from time import monotonic
 from typing import Any, NamedTuple, TYPE_CHECKING
 
 import cv2
@@ -25,6 +26,8 @@ load_dotenv()
 
 MQTT_HOST = getenv('MQTT_HOST', 'localhost')
 MQTT_PORT = int(getenv('MQTT_PORT', 1883))
+# TLS is on by default for remote brokers; a broker on this machine is reached over plain TCP
+MQTT_TLS = getenv('MQTT_TLS', str(MQTT_HOST not in ('localhost', '127.0.0.1', '::1'))).lower() in ('1', 'true', 'yes')
 
 logging.basicConfig(
     level=logging.INFO,
@@ -83,6 +86,20 @@ class CategorizationResponse(NamedTuple):
             confidence=raw['confidence'],
         )
 
+    @classmethod
+    def decode(cls, payload: bytes) -> Self:
+        """Decodes a msgpack categorization payload.
+
+        Payloads may be the positional array ``[id, x, y, name, context, width, height, hue, confidence]``,
+        which unpacks straight into the tuples, or the older ``{'category': {...}, 'confidence': ...}`` map.
+        """
+        raw = msgpack.loads(payload, use_list=False)
+        if isinstance(raw, dict):
+            return cls.from_dict(raw)
+
+        id_, x, y, name, context, width, height, hue, confidence = raw
+        return cls(Category(id_, (x, y), name, context, (width, height), hue), confidence)
+
 
 class SystemState(Enum):
     idle = 0
@@ -100,12 +117,17 @@ class SystemState(Enum):
 class WebcamMQTTPublisher:
     """Main class for handling webcam image capture and MQTT communication."""
     
-    def __init__(self, *, keepalive: float = 8.0) -> None:
+    def __init__(self, *, keepalive: float = 8.0, duplicate_window: float = 30.0) -> None:
         self.webcam: Webcam = Webcam()
         self.mqtt_client: MQTTClient = None
         self.is_running: bool = False
         self._keepalive: float = keepalive
+        self._stop: Event = Event()
+        self._keepalive_thread: Thread | None = None
         self._next_keepalive_due: datetime.datetime = datetime.datetime.now()
+        # the last status successfully published, and its packed form
+        self._status_key: tuple[Any, ...] | None = None
+        self._status_bytes: bytes | None = None
 
         self.state: SystemState = SystemState.idle
         self.last_sort_request: datetime.datetime | None = None
@@ -116,24 +138,37 @@ class WebcamMQTTPublisher:
         self.button.when_pressed = self.process_image  # Trigger image capture on button press
         self.system = get_system()
 
+        # The button/MQTT callbacks only queue a capture request; the frame is read (which waits for the
+        # camera's next frame), encoded and published on a worker thread, so callbacks return immediately.
+        # Requests while an image is still pending are dropped. Each request says whether it was explicit.
+        self._capture_requests: queue.Queue[bool] = queue.Queue(maxsize=1)
+        # an unchanged scene is not re-published within this many seconds of its last publish (0 to disable),
+        # unless the capture was explicitly asked for
+        self._duplicate_window: float = duplicate_window
+        self._last_fingerprint: int | None = None
+        self._last_image_publish: float = 0.0
+        Thread(target=self._encode_worker, name='encode-worker', daemon=True).start()
+
     def setup_mqtt(self) -> bool:
         """Initialize MQTT client"""
         try:
             self.mqtt_client = mqtt.Client(client_id='controller', userdata=None, protocol=mqtt.MQTTv5)
-            self.mqtt_client.tls_set(tls_version=ssl.PROTOCOL_TLS)
+            if MQTT_TLS:
+                # one context for the client's lifetime, so reconnects don't reload the CA store
+                self.mqtt_client.tls_set_context(ssl.create_default_context())
             self.mqtt_client.username_pw_set(getenv('MQTT_USERNAME'), getenv('MQTT_PASSWORD'))
             
             self.mqtt_client.on_connect = self.on_mqtt_connect
             self.mqtt_client.on_disconnect = self.on_mqtt_disconnect
             self.mqtt_client.on_message = self.on_mqtt_message
             self.mqtt_client.on_publish = self.on_mqtt_publish
+            self.mqtt_client.max_inflight_messages_set(20)
 
             # Connect to broker
             self.mqtt_client.connect(MQTT_HOST, MQTT_PORT, keepalive=60)
             self.mqtt_client.subscribe('/capture')
             self.mqtt_client.subscribe('/categorization')
             self.mqtt_client.subscribe('/error/categorization')
-            self.mqtt_client.loop_start()
 
             logger.info(f"MQTT client setup complete. Connecting to {MQTT_HOST}:{MQTT_PORT}")
             return True
@@ -154,6 +189,13 @@ class WebcamMQTTPublisher:
 
     def on_mqtt_message(self, _client, _userdata, msg: MQTTMessage) -> None:
         """Callback for when a message is received"""
+        # the network loop runs on the main thread, so an error escaping here would end run()
+        try:
+            self._handle_message(msg)
+        except Exception:
+            logger.exception(f"Error handling message on {msg.topic}")
+
+    def _handle_message(self, msg: MQTTMessage) -> None:
         if msg.topic.startswith('/error'):
             error = msgpack.loads(msg.payload)
             try:
@@ -163,15 +205,17 @@ class WebcamMQTTPublisher:
             return
         
         elif msg.topic == '/capture':
-            logger.info("Received manual capture request")
-            self.process_image()
+            # a retained request replayed on (re)subscribe, or a redelivered one, wasn't a fresh ask
+            explicit = not (msg.retain or msg.dup)
+            logger.info(f"Received {'manual' if explicit else 'repeated'} capture request")
+            self.process_image(explicit=explicit)
             return
         
         if not msg.topic.startswith('/categorization'):
             logger.debug(f"Received message on topic {msg.topic}, but not handling it")
             return
         
-        response = CategorizationResponse.from_dict(msgpack.loads(msg.payload))
+        response = CategorizationResponse.decode(msg.payload)
         logger.info(f"Received categorization response: {response!r}")
         Thread(target=self.process_sort_request, name='sort-worker', args=(response.category,)).start()
 
@@ -181,8 +225,13 @@ class WebcamMQTTPublisher:
 
     def publish_image(self, image_data: bytes) -> bool:
         """Publish image to MQTT broker for processing"""
+        if not self.mqtt_client.is_connected():
+            # a new frame will follow, so don't let stale ones pile up in paho's outgoing queue
+            logger.warning("Not connected to MQTT broker, dropping image")
+            return False
+
         try:
-            result = self.mqtt_client.publish('/webcam', image_data)
+            result = self.mqtt_client.publish('/webcam', image_data, qos=0)
 
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 self.set_processing()
@@ -196,26 +245,58 @@ class WebcamMQTTPublisher:
             logger.error(f"Error publishing image: {e}")
             return False
 
-    def process_image(self) -> None:
-        image_data = self.webcam.capture()
+    def process_image(self, *, explicit: bool = True) -> None:
+        """Queues a capture request. Unless `explicit`, it is skipped if the scene hasn't changed recently."""
+        try:
+            self._capture_requests.put_nowait(explicit)
+        except queue.Full:
+            logger.info("Previous image is still being processed, ignoring capture request")
+
+    def _encode_worker(self) -> None:
+        while True:
+            explicit = self._capture_requests.get()
+            if self._stop.is_set():
+                return
+            # an unexpected error must not end the worker, or the queue would never be drained again
+            try:
+                frame = self.webcam.read()
+                if frame is None:
+                    logger.warning("No image data captured, skipping publish")
+                    continue
+                self._publish_frame(frame, explicit=explicit)
+            except Exception:
+                logger.exception("Error processing image")
+
+    def _publish_frame(self, frame: cv2.Mat, *, explicit: bool) -> None:
+        fingerprint = self.webcam.fingerprint(frame)
+        if (
+            not explicit
+            and fingerprint == self._last_fingerprint
+            and monotonic() - self._last_image_publish < self._duplicate_window
+        ):
+            logger.info("Scene unchanged since the last image, skipping publish")
+            return
+
+        # always the frame just captured, since a matching fingerprint doesn't guarantee an identical scene
+        image_data = self.webcam.encode(frame)
         if image_data:
             # Publish to MQTT
-            self.publish_image(image_data)
+            if self.publish_image(image_data):
+                self._last_fingerprint = fingerprint
+                self._last_image_publish = monotonic()
         else:
-            logger.warning("No image data captured, skipping publish")
+            logger.warning("Failed to encode image, skipping publish")
 
     def process_sort_request(self, target: Category) -> None:
         self.set_sorting(target)
-        self.display.clear()
-        self.display.write_top('Category:')
-        self.display.write_bottom(target.name, offset_left=16 - len(target.name))
+        self.display.write_frame('Category:', target.name.rjust(16))
         
         # convert from (0, 0) at top left to (0, 0) at bottom center:
         GANTRY_HEIGHT = 18  # inches
         pos = target.x, GANTRY_HEIGHT - target.y
 
         logger.info(f"Running gantry to position {pos}")
-        self.system.process_sort_request(*pos)
+        self.system.process_sort_request(pos)
         
         self.set_idle()
         self.system.gantry.set_target(0, 0)
@@ -248,16 +329,33 @@ class WebcamMQTTPublisher:
         }
         
     def update_status(self) -> None:
-        """Sends a status update through MQTT /status topic"""
-        self._next_keepalive_due = datetime.datetime.now() + datetime.timedelta(seconds=self._keepalive)
+        """Sends a status update through MQTT /status topic
+
+        An unchanged status is only re-sent once the keepalive interval is nearly up, and its packed form is reused.
+        """
+        now = datetime.datetime.now()
         status = self._status_to_dict()
         if not status:
+            self._next_keepalive_due = now + datetime.timedelta(seconds=self._keepalive)
             logger.warning("Invalid status to update")
             return
 
+        key = tuple(status.values())
+        if key == self._status_key:
+            if now < self._next_keepalive_due - datetime.timedelta(seconds=self._keepalive * 0.1):
+                logger.debug(f"Status unchanged, skipping update: {status}")
+                return
+            payload = self._status_bytes
+        else:
+            payload = msgpack.packb(status)
+
+        self._next_keepalive_due = now + datetime.timedelta(seconds=self._keepalive)
         try:
-            result = self.mqtt_client.publish('/status', msgpack.dumps(status))
+            # retained, so subscribers that connect later see the current status straight away
+            result = self.mqtt_client.publish('/status', payload, qos=0, retain=True)
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
+                self._status_key = key
+                self._status_bytes = payload
                 logger.info(f"Status updated: {status} (mid: {result.mid})")
             else:
                 logger.error(f"Failed to publish status. Error code: {result.rc}")
@@ -283,12 +381,10 @@ class WebcamMQTTPublisher:
         self.display.write('Ready...')
 
         try:
-            while self.is_running:
-                delta = self._next_keepalive_due - datetime.datetime.now()
-                remaining = delta.total_seconds()
-                if remaining <= 0.0:
-                    self.update_status()
-                time.sleep(max(0.5, remaining))
+            self._keepalive_thread = Thread(target=self._keepalive_loop, name='status-keepalive', daemon=True)
+            self._keepalive_thread.start()
+            # the MQTT network loop runs on this thread until cleanup() disconnects the client
+            self.mqtt_client.loop_forever()
         except KeyboardInterrupt:
             self.display.write('Shutting down...', 'Received SIGINT')
             logger.info("Received keyboard interrupt. Shutting down...")
@@ -298,18 +394,30 @@ class WebcamMQTTPublisher:
         finally:
             self.cleanup()
 
+    def _keepalive_loop(self) -> None:
+        """Sends a status keepalive whenever one is due, sleeping in between until cleanup() sets the stop event"""
+        now = datetime.datetime.now
+        while not self._stop.wait(max(0.0, (self._next_keepalive_due - now()).total_seconds())):
+            # status changes push the deadline back, in which case there is nothing to send yet
+            if self._next_keepalive_due <= now():
+                try:
+                    self.update_status()
+                except Exception:
+                    logger.exception("Error sending status keepalive")
+                    self._next_keepalive_due = now() + datetime.timedelta(seconds=self._keepalive)
+
     def cleanup(self):
         """Clean up resources"""
         logger.info("Cleaning up resources...")
 
         self.is_running = False
+        self._stop.set()  # also wakes the keepalive thread, which then exits
         self.system.release()
 
         if self.webcam.is_alive():
             self.webcam.release()
 
         if self.mqtt_client:
-            self.mqtt_client.loop_stop()
             self.mqtt_client.disconnect()
             logger.info("MQTT client disconnected")
 
@@ -33,11 +33,16 @@ class System:
         """Prepares the system for graceful shutdown."""
         self.gantry.stop()
         self.gantry.disable()
+        self.gantry.deinit()
 
     def process_sort_request(self, position: tuple[float, float]) -> None:
-        """Process a sort request by moving the gantry to the specified position."""
+        """Process a sort request by moving the gantry to the specified position.
+
+        The end effector is reset while the gantry is already on its way to the grab position.
+        """
         self.claw.open()
+        self.gantry.set_target(*self._grab_position)  # move to grab; the steppers run in their own threads
         self.end_effector.reset()
-        self.gantry.run_to_position(*self._grab_position)  # move to grab
+        self.gantry.wait()
         self.claw.close()
         self.gantry.run_to_position(*position)
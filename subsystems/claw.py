@@ -36,22 +36,31 @@ class Claw:
         self._support_servo = support_servo
         self._support_range = (support_open, support_closed)
 
+    @staticmethod
+    def _angle(t: float, lo: float, hi: float) -> float:
+        """The servo angle for a normalized value `t` (0.0 to 1.0), without arithmetic at the endpoints."""
+        if t == 0.0:
+            return lo
+        if t == 1.0:
+            return hi
+        return interpolate(t, lo, hi)
+
     def _set_grip(self, t: float) -> None:
         """Set the grip servo to a position based on a normalized value `t` (0.0 to 1.0)."""
-        angle = interpolate(t, *self._grip_range)
-        self._grip_servo.angle = angle
+        self._grip_servo.angle = self._angle(t, *self._grip_range)
         
     def _set_support(self, t: float) -> None:
         """Set the support servo to a position based on a normalized value `t` (0.0 to 1.0)."""
-        angle = interpolate(t, *self._support_range)
-        self._support_servo.angle = angle
+        self._support_servo.angle = self._angle(t, *self._support_range)
 
     def set(self, *, grip: float | None = None, support: float | None = None) -> None:
         """Set the grip servo to a position based on a normalized value `t` (0.0 to 1.0)."""
+        angles = {}
         if grip is not None:
-            self._set_grip(grip)
+            angles[self._grip_servo] = self._angle(grip, *self._grip_range)
         if support is not None:
-            self._set_support(support)
+            angles[self._support_servo] = self._angle(support, *self._support_range)
+        Servo.write_many(angles)  # both servos in one I2C write when their channels are adjacent
 
     def open(self, *, support: bool = 1.0) -> None:
         """Sets the claw to the completely open position."""
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from time import monotonic, sleep
+
 from devices import Servo
 
 
@@ -15,7 +18,7 @@ class Differential:
     """
 
     __slots__ = (
-        '_left_servo', '_right_servo', '_neutral',
+        '_left_servo', '_right_servo', '_left_neutral', '_right_neutral',
         '_last_pitch', '_last_roll',
     )
 
@@ -25,25 +28,68 @@ class Differential:
         self._left_servo: Servo = left_servo
         self._right_servo: Servo = right_servo
 
-        self._neutral = self._left_servo.angle, self._right_servo.angle
+        self._left_neutral: float = self._left_servo.angle
+        self._right_neutral: float = self._right_servo.angle
         self._last_pitch: float = 0.0
         self._last_roll: float = 0.0
         
-    def set(self, *, pitch: float | None = None, roll: float | None = None) -> None:
-        l, r = self._neutral
-        pitch = pitch if pitch is not None else self._last_pitch
-        roll = roll if roll is not None else self._last_roll
-        
-        self._left_servo.angle = l + pitch - roll
-        self._right_servo.angle = r + pitch + roll
+    def _angles(
+        self, pitch: float | None, roll: float | None, *, force: bool = False,
+    ) -> tuple[float, float, dict[Servo, float]]:
+        """Resolve the pose for the given pitch and roll (None keeps the current one), and the servo angles for it.
+
+        The angles are an empty mapping if the pose is unchanged and `force` is not set, since there is nothing
+        to write. The pose is not recorded; call :meth:`_record` once the angles have been written.
+        """
+        pitch = self._last_pitch if pitch is None else pitch
+        roll = self._last_roll if roll is None else roll
+        if not force and pitch == self._last_pitch and roll == self._last_roll:
+            return pitch, roll, {}
+        return pitch, roll, self._pose_angles(pitch, roll)
+
+    def _record(self, pitch: float, roll: float) -> None:
+        """Record the pose the servos were last written with."""
         self._last_pitch = pitch
         self._last_roll = roll
+
+    def _pose_angles(self, pitch: float, roll: float) -> dict[Servo, float]:
+        """The servo angles for the given pitch and roll."""
+        return {
+            self._left_servo: self._left_neutral + pitch - roll,
+            self._right_servo: self._right_neutral + pitch + roll,
+        }
+
+    def set(self, *, pitch: float | None = None, roll: float | None = None) -> None:
+        pitch, roll, angles = self._angles(pitch, roll)
+        Servo.write_many(angles)
+        self._record(pitch, roll)
         
     def reset(self) -> None:
-        """Reset the end effector to its neutral position."""
-        self._left_servo.angle, self._right_servo.angle = self._neutral
-        self._last_pitch = 0.0
-        self._last_roll = 0.0
+        """Reset the end effector to its neutral position, rewriting it even if it is already the current pose."""
+        Servo.write_many(self._angles(0.0, 0.0, force=True)[2])
+        self._record(0.0, 0.0)
+
+    def run_trajectory(self, poses: Iterable[tuple[float, float]], interval: float) -> None:
+        """Move through a sequence of (pitch, roll) poses, one every `interval` seconds, blocking the main thread.
+
+        The servo angles for every pose are computed before the first one is written.
+
+        Parameters
+        ----------
+        poses: Iterable[tuple[float, float]]
+            The (pitch, roll) poses to visit, in degrees.
+        interval: float
+            The time between poses, in seconds.
+        """
+        frames = [(pitch, roll, self._pose_angles(pitch, roll)) for pitch, roll in poses]
+        deadline = monotonic()
+        for pitch, roll, angles in frames:
+            Servo.write_many(angles)
+            self._record(pitch, roll)
+            deadline += interval
+            remaining = deadline - monotonic()
+            if remaining > 0:
+                sleep(remaining)
 
     @property
     def pitch(self) -> float:
@@ -87,15 +133,20 @@ class EndEffector:
 
     def set(self, *, pitch: float | None = None, roll: float | None = None, yaw: float | None = None) -> None:
         """Set the pitch, roll, and yaw of the end effector."""
-        if pitch is not None or roll is not None:
-            self._differential.set(pitch=pitch, roll=roll)
+        differential = self._differential
+        pitch, roll, angles = differential._angles(pitch, roll)
         if yaw is not None:
-            self._yaw.angle = self._yaw_neutral + yaw
+            angles[self._yaw] = self._yaw_neutral + yaw
+        Servo.write_many(angles)
+        differential._record(pitch, roll)
             
     def reset(self) -> None:
-        """Reset the end effector to its neutral position."""
-        self._differential.reset()
-        self._yaw.angle = self._yaw_neutral
+        """Reset the end effector to its neutral position, rewriting it even if it is already the current pose."""
+        differential = self._differential
+        angles = differential._angles(0.0, 0.0, force=True)[2]
+        angles[self._yaw] = self._yaw_neutral
+        Servo.write_many(angles)
+        differential._record(0.0, 0.0)
         
     @property
     def pitch(self) -> float:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from math import pi
 
 from devices import TMCStepper
@@ -26,7 +27,7 @@ class Gantry:
         Defaults to ``(0.0, 0.0)``.
     """
 
-    __slots__ = ('_left', '_right', '_zero_position', '_steps_per_inch')
+    __slots__ = ('_left', '_right', '_zx', '_zy', '_spi_l', '_spi_r', '_max_speeds', '_accelerations')
     
     def __init__(
         self, 
@@ -38,11 +39,13 @@ class Gantry:
     ) -> None:
         self._left = left
         self._right = right
-        self._steps_per_inch = (
-            revolutions_per_inch * left.steps_per_revolution,
-            revolutions_per_inch * right.steps_per_revolution,
-        )
-        self._zero_position = self._cartesian_to_steps(*position)
+        # steps per inch of each motor, and the zero position in inches, kept as plain floats for the transforms
+        self._spi_l: float = revolutions_per_inch * left.steps_per_revolution
+        self._spi_r: float = revolutions_per_inch * right.steps_per_revolution
+        self._zx, self._zy = position
+        # each motor's configured profile, which set_target scales down for the motor with less distance to cover
+        self._max_speeds = left.max_speed, right.max_speed
+        self._accelerations = left.acceleration, right.acceleration
 
     @property
     def left(self) -> TMCStepper:
@@ -69,25 +72,39 @@ class Gantry:
         self._left.stop()
         self._right.stop()
 
+    def deinit(self) -> None:
+        """Release both motor drivers, closing their shared UART once neither uses it."""
+        self._left.deinit()
+        self._right.deinit()
+
     def _cartesian_to_steps(self, x: float, y: float) -> tuple[int, int]:
-        ox, oy = getattr(self, '_zero_position', (0.0, 0.0))
-        x, y = x - ox, y - oy
-        l, r = self._steps_per_inch
-        return round(l * (y - x)), round(r * (y + x))
+        x, y = x - self._zx, y - self._zy
+        return round(self._spi_l * (y - x)), round(self._spi_r * (y + x))
+
+    def _cartesian_to_steps_batch(self, points: Iterable[tuple[float, float]]) -> list[tuple[int, int]]:
+        """Converts many (x, y) positions at once, with the offsets and scales looked up once for the whole batch."""
+        ox, oy, l, r = self._zx, self._zy, self._spi_l, self._spi_r
+        return [(round(l * ((y - oy) - (x - ox))), round(r * ((y - oy) + (x - ox)))) for x, y in points]
     
     def _steps_to_cartesian(self, left: int, right: int) -> tuple[float, float]:
-        ox, oy = self._zero_position
-        l, r = self._steps_per_inch
-        x, y = (right - left) / 2, (left + right) / 2
-        return x / l + ox, y / r + oy
+        left, right = left / self._spi_l, right / self._spi_r  # each motor's travel, in inches
+        return (right - left) / 2 + self._zx, (left + right) / 2 + self._zy
         
     def wait(self) -> None:
-        """Wait for the gantry motors to finish moving to their targets."""
+        """Wait for the gantry motors to finish moving to their targets.
+
+        Both motors run on their own movement threads, so waiting on one and then the other takes only as long
+        as the slower move, and each join releases the GIL.
+        """
         self._left.wait()
         self._right.wait()
         
     def set_target(self, x: float, y: float) -> None:
         """Move the gantry to the specified (x, y) position, relative to the initially specified position.
+
+        The end effector moves in a straight line: the motor with further to go runs at its configured speed
+        and acceleration, and the other one at the same fraction of its own as its share of the distance, so
+        both follow the same trapezoidal profile and finish together.
         
         Parameters
         ----------
@@ -97,8 +114,8 @@ class Gantry:
             The target y-coordinate in inches.
         """
         left, right = self._cartesian_to_steps(x, y)
-        self._left.target = left
-        self._right.target = right
+        self._synchronize_profiles(left, right)
+        TMCStepper.set_targets({self._left: left, self._right: right})
         
     def run_to_position(self, x: float, y: float) -> None:
         """Move the gantry to the specified (x, y) position, blocking the main thread.
@@ -111,8 +128,41 @@ class Gantry:
             The target y-coordinate in inches.
         """
         self.set_target(x, y)
-        self._left.wait()
-        self._right.wait()
+        self.wait()
+
+    def run_path(self, points: Iterable[tuple[float, float]]) -> None:
+        """Move the gantry through a sequence of (x, y) positions in turn, blocking the main thread.
+
+        All waypoints are converted to step targets before the first move starts.
+
+        Parameters
+        ----------
+        points: Iterable[tuple[float, float]]
+            The (x, y) positions to visit, in inches.
+        """
+        targets = self._cartesian_to_steps_batch(points)
+        for left, right in targets:
+            self._synchronize_profiles(left, right)
+            TMCStepper.set_targets({self._left: left, self._right: right})
+            self.wait()
+
+    def _synchronize_profiles(self, left: int, right: int) -> None:
+        """Scales each motor's speed and acceleration by its share of the longer of the two moves.
+
+        Scaling both by the same ratio stretches a trapezoidal profile in distance but not in time,
+        so the two motors stay in proportion for the whole move.
+        """
+        distances = abs(left - self._left.position), abs(right - self._right.position)
+        longest = max(distances)
+        if not longest:
+            return
+        for motor, distance, speed, acceleration in zip(
+            (self._left, self._right), distances, self._max_speeds, self._accelerations,
+        ):
+            # a motor that doesn't move gets its configured profile back, since a zero acceleration is invalid
+            ratio = distance / longest if distance else 1.0
+            motor.max_speed = speed * ratio
+            motor.acceleration = acceleration * ratio
 
     def reset(self) -> None:
         """Reset the gantry to the initial position (0, 0)."""